@@ -1,8 +1,11 @@
 # ContextAgent: enriches security findings with contextual information from the vector knowledge base using RAG. Optimized for performance and API limits.
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
+from concurrent.futures import Future
 import os
+import queue
 import sys
+import threading
 import time
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -88,6 +91,91 @@ class ContextAgent:
                 enriched.append(finding)
         return enriched
 
+    def process_findings_stream(self, findings: Iterable[Dict[str, Any]], max_enrich: int = 20,
+                                workers: int = 4, queue_size: int = 32) -> List[Dict[str, Any]]:
+        # streaming counterpart of process_findings: findings are enriched while the iterable
+        # (e.g. DetectorAgent.stream) is still scanning the log. a bounded queue applies
+        # backpressure to the scan, and the result has the same order as the batch mode
+        print(f"[ContextAgent] Streaming findings into {workers} enrichment workers...")
+        start = time.time()
+        work_queue = queue.Queue(maxsize=queue_size)
+        lock = threading.Lock()
+        query_context_cache = {}
+        enriched_by_index = {}
+        not_enriched = []
+        errors = []
+        # set on the first worker error so the producer stops scanning, like the batch mode failing fast
+        failed = threading.Event()
+
+        def produce():
+            try:
+                for idx, finding in enumerate(findings):
+                    if failed.is_set():
+                        break
+                    if idx < max_enrich:
+                        # blocks while the workers are behind, throttling the log scan
+                        work_queue.put((idx, finding))
+                    else:
+                        # keep consuming so the detector finishes (and caches) the full scan
+                        not_enriched.append(finding)
+            except Exception as e:
+                errors.append(e)
+                failed.set()
+            finally:
+                for _ in range(workers):
+                    work_queue.put(None)
+
+        def consume():
+            while True:
+                item = work_queue.get()
+                if item is None:
+                    return
+                if failed.is_set():
+                    # keep draining after a failure so the producer never blocks on a full queue
+                    continue
+                idx, finding = item
+                try:
+                    query = self.generate_query(finding)
+                    # the first worker to see a query runs the search, the others wait for its result
+                    with lock:
+                        future = query_context_cache.get(query)
+                        owner = future is None
+                        if owner:
+                            future = query_context_cache[query] = Future()
+                    if owner:
+                        try:
+                            future.set_result(self.provide_context(query))
+                        except Exception as e:
+                            future.set_exception(e)
+                    enriched_finding = finding.copy()
+                    enriched_finding['context'] = future.result()
+                    with lock:
+                        enriched_by_index[idx] = (query, enriched_finding)
+                except Exception as e:
+                    errors.append(e)
+                    failed.set()
+
+        threads = [threading.Thread(target=produce, daemon=True)]
+        threads += [threading.Thread(target=consume, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        # rebuild the batch ordering: findings grouped by query, groups in order of first appearance
+        query_groups = {}
+        for idx in sorted(enriched_by_index):
+            query, enriched_finding = enriched_by_index[idx]
+            query_groups.setdefault(query, []).append(enriched_finding)
+        enriched = [finding for group in query_groups.values() for finding in group]
+        elapsed = time.time() - start
+        print(f"[ContextAgent] Total time to enrich findings (streamed): {elapsed:.2f} seconds")
+        if not_enriched:
+            print(f"[ContextAgent] Only the first {max_enrich} findings were enriched. The rest are returned without context.")
+            enriched.extend(not_enriched)
+        return enriched
+
 if __name__ == "__main__":
     # this block allows testing the context agent in isolation with sample findings
     test_findings = [
@@ -1,60 +1,99 @@
-# DetectorAgent: analyzes a log file and detects anomalies or IOCs, exporting findings to CSV.
+# DetectorAgent: analyzes a log file and detects anomalies or IOCs, exporting findings to a compressed JSONL cache.
 
-from utils.log_parser import parse_log
+from utils.log_parser import iter_log
+from utils import findings_cache
 import re
-import csv
+import hashlib
+
+# bump whenever the detection rules below change so cached findings are invalidated
+RULESET_VERSION = "2"
 
 class DetectorAgent:
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
+
     def analyze(self, log_file_path):
-        # parse the log file into structured entries
-        logs = parse_log(log_file_path)
-        findings = []
+        # return the list of findings for downstream processing
+        return list(self.stream(log_file_path))
+
+    def stream(self, log_file_path):
+        # yield findings as they are produced, serving them from the cache when the log is unchanged
+        if self.use_cache and findings_cache.is_valid(log_file_path, RULESET_VERSION):
+            print(f"[DetectorAgent] Loading cached findings for {log_file_path}")
+            yield from findings_cache.load_findings(log_file_path)
+            return
+        # the cache is best-effort: if it cannot be written, fall back to a plain uncached scan
+        try:
+            writer = findings_cache.FindingsWriter(log_file_path, RULESET_VERSION)
+        except OSError:
+            yield from self.detect(log_file_path)
+            return
+        # hash the bytes as they are parsed so the cache key matches the content the findings came from
+        digest = hashlib.sha256()
+        read_errors = []
+        # write each finding as soon as it is found; the cache is only published after a full scan
+        try:
+            for finding in self.detect_entries(iter_log(log_file_path, digest=digest, errors=read_errors)):
+                if writer is not None:
+                    try:
+                        writer.write(finding)
+                    except OSError:
+                        writer.abort()
+                        writer = None
+                yield finding
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is None:
+            return
+        if read_errors:
+            # a failed or partial read must never be cached
+            writer.abort()
+            return
+        try:
+            writer.commit(digest.hexdigest())
+        except OSError:
+            writer.abort()
+
+    def detect(self, log_file_path):
+        # scan the log file line by line as it is read
+        return self.detect_entries(iter_log(log_file_path))
+
+    def detect_entries(self, logs):
+        # single pass over the entries so findings are produced while the log is still being read
         # regex to detect failed login attempts or authentication failures
         failed_login_pattern = re.compile(r"failed login|authentication failure", re.IGNORECASE)
         # list of ips considered suspicious for demo/testing purposes
         suspicious_ip_list = ["192.168.1.100", "10.0.0.200"]
-        if logs:
-            ip_fail_count = {}
-            for entry in logs:
-                # detect failed login events and extract ip if present
-                if failed_login_pattern.search(str(entry)):
-                    findings.append({"type": "failed_login", "entry": entry})
-                    ip_match = re.search(r"from (\d+\.\d+\.\d+\.\d+)", entry)
-                    if ip_match:
-                        ip = ip_match.group(1)
-                        # count failed logins per ip for brute force detection
-                        ip_fail_count[ip] = ip_fail_count.get(ip, 0) + 1
-                # flag entries containing any suspicious ip
-                for ip in suspicious_ip_list:
-                    if ip in str(entry):
-                        findings.append({"type": "suspicious_ip", "ip": ip, "entry": entry})
-            # if an ip has multiple failed logins, flag as possible brute force
-            for ip, count in ip_fail_count.items():
-                if count >= 2:
-                    findings.append({"type": "multiple_failed_logins", "ip": ip, "count": count})
         # additional patterns for other attack types
         brute_force_pattern = re.compile(r"(too many failed attempts|brute force)", re.IGNORECASE)
         privilege_escalation_pattern = re.compile(r"sudo|root access granted|privilege escalation", re.IGNORECASE)
         malware_pattern = re.compile(r"malware|trojan|virus|worm|ransomware", re.IGNORECASE)
+        ip_fail_count = {}
         for entry in logs:
+            # detect failed login events and extract ip if present
+            if failed_login_pattern.search(str(entry)):
+                yield {"type": "failed_login", "entry": entry}
+                ip_match = re.search(r"from (\d+\.\d+\.\d+\.\d+)", entry)
+                if ip_match:
+                    ip = ip_match.group(1)
+                    # count failed logins per ip for brute force detection
+                    ip_fail_count[ip] = ip_fail_count.get(ip, 0) + 1
+            # flag entries containing any suspicious ip
+            for ip in suspicious_ip_list:
+                if ip in str(entry):
+                    yield {"type": "suspicious_ip", "ip": ip, "entry": entry}
             # detect brute force attempts
             if brute_force_pattern.search(str(entry)):
-                findings.append({"type": "brute_force_attempt", "entry": entry})
+                yield {"type": "brute_force_attempt", "entry": entry}
             # detect privilege escalation events
             if privilege_escalation_pattern.search(str(entry)):
-                findings.append({"type": "privilege_escalation", "entry": entry})
+                yield {"type": "privilege_escalation", "entry": entry}
             # detect malware-related events
             if malware_pattern.search(str(entry)):
-                findings.append({"type": "malware_detected", "entry": entry})
-        # export all findings to a csv file for further analysis or reporting
-        output_path = log_file_path + "_findings.csv"
-        if findings:
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                # dynamically determine all fieldnames from findings
-                fieldnames = sorted({k for f in findings for k in f.keys()})
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for finding in findings:
-                    writer.writerow(finding)
-        # return the list of findings for downstream processing
-        return findings
+                yield {"type": "malware_detected", "entry": entry}
+        # if an ip has multiple failed logins, flag as possible brute force (only known once the scan ends)
+        for ip, count in ip_fail_count.items():
+            if count >= 2:
+                yield {"type": "multiple_failed_logins", "ip": ip, "count": count}
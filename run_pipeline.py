@@ -2,6 +2,7 @@
 
 import os
 import sys
+from itertools import chain
 from agents.detector_agent import DetectorAgent
 from agents.context_agent import ContextAgent
 from agents.response_agent import ResponseAgent
@@ -10,6 +11,8 @@ from langgraph.graph import StateGraph, END
 # set the log and vector store paths for the pipeline
 log_path = os.path.join("data", "logs", "custom_test.log")
 vector_store_path = os.path.join("data", "vector_store")
+# pass --stream to overlap detection and enrichment instead of running them one after another
+streaming = "--stream" in sys.argv
 
 # define pipeline steps as functions compatible with langchain/langgraph
 # each step receives and returns a state dict for chaining
@@ -29,6 +32,23 @@ def context_step(state):
     enriched_findings = context_agent.process_findings(findings, max_enrich=300)
     return {"enriched_findings": enriched_findings}
 
+def detect_context_stream_step(state):
+    # streaming mode: findings flow from the detector into the context agent while the log is still being scanned
+    detector = DetectorAgent()
+    findings = []
+    def scan():
+        for finding in detector.stream(log_path):
+            findings.append(finding)
+            yield finding
+    stream = scan()
+    # peek the first finding so an empty log never builds the llm client, matching context_step
+    first = next(stream, None)
+    if first is None:
+        return {"findings": findings, "enriched_findings": []}
+    context_agent = ContextAgent(vector_store_path=vector_store_path)
+    enriched_findings = context_agent.process_findings_stream(chain([first], stream), max_enrich=300, workers=4, queue_size=32)
+    return {"findings": findings, "enriched_findings": enriched_findings}
+
 def response_step(state):
     # select the most relevant findings and generate a report using the response agent
     enriched_findings = state["enriched_findings"]
@@ -55,12 +75,18 @@ if __name__ == "__main__":
     print("\n=== cybersentinel-rag: automated analysis pipeline (langgraph) ===\n")
     # define the graph with state dict as schema
     workflow = StateGraph(state_schema=dict)
-    workflow.add_node("detect", detect_step)
-    workflow.add_node("context", context_step)
     workflow.add_node("response", response_step)
-    workflow.set_entry_point("detect")
-    workflow.add_edge("detect", "context")
-    workflow.add_edge("context", "response")
+    if streaming:
+        print("[pipeline] streaming mode: detection and enrichment run concurrently.")
+        workflow.add_node("detect_context", detect_context_stream_step)
+        workflow.set_entry_point("detect_context")
+        workflow.add_edge("detect_context", "response")
+    else:
+        workflow.add_node("detect", detect_step)
+        workflow.add_node("context", context_step)
+        workflow.set_entry_point("detect")
+        workflow.add_edge("detect", "context")
+        workflow.add_edge("context", "response")
     workflow.add_edge("response", END)
     graph = workflow.compile()
     # run the graph and collect results
@@ -0,0 +1,133 @@
+# Findings cache: stores detector findings as compressed JSONL next to the log and reuses them while the log and ruleset are unchanged.
+
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator
+
+# fixed schema for every stored finding; missing fields are written as null
+FINDING_FIELDS = ("type", "ip", "count", "entry")
+
+# Returns the paths of the compressed findings file and its metadata sidecar for a log.
+def cache_paths(log_file_path: str) -> Dict[str, str]:
+    return {
+        "findings": log_file_path + "_findings.jsonl.gz",
+        "meta": log_file_path + "_findings.meta.json",
+    }
+
+# Computes a sha256 digest of the log content, reading it in chunks to keep memory flat.
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Builds the cache key for a log: absolute path, size, mtime and ruleset version.
+def build_key(log_file_path: str, ruleset_version: str) -> Dict[str, Any]:
+    stat = os.stat(log_file_path)
+    return {
+        "path": os.path.abspath(log_file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "ruleset_version": ruleset_version,
+    }
+
+# Checks whether the stored findings are still valid for the given log and ruleset.
+# Size and mtime give a fast path; if only the mtime changed the content hash decides.
+def is_valid(log_file_path: str, ruleset_version: str) -> bool:
+    paths = cache_paths(log_file_path)
+    if not (os.path.exists(paths["meta"]) and os.path.exists(paths["findings"])):
+        return False
+    try:
+        with open(paths["meta"], 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        key = build_key(log_file_path, ruleset_version)
+    except (OSError, ValueError):
+        return False
+    for field in ("path", "size", "ruleset_version"):
+        if meta.get(field) != key[field]:
+            return False
+    if meta.get("mtime_ns") == key["mtime_ns"]:
+        return True
+    try:
+        if meta.get("sha256") != file_digest(log_file_path):
+            return False
+    except OSError:
+        return False
+    # content is identical (e.g. the file was only touched), refresh the mtime to skip hashing next time
+    meta["mtime_ns"] = key["mtime_ns"]
+    try:
+        _write_meta(paths["meta"], meta)
+    except OSError:
+        pass
+    return True
+
+# Yields the stored findings in their original order, dropping null fields.
+def load_findings(log_file_path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(cache_paths(log_file_path)["findings"], 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            yield {k: v for k, v in record.items() if v is not None}
+
+def _write_meta(meta_path: str, meta: Dict[str, Any]) -> None:
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class FindingsWriter:
+    # Writes findings incrementally to a temporary file; commit() publishes it together with
+    # the cache metadata, abort() discards it so a partial scan is never served as a cache hit.
+    def __init__(self, log_file_path: str, ruleset_version: str):
+        self.log_file_path = log_file_path
+        self.ruleset_version = ruleset_version
+        self.paths = cache_paths(log_file_path)
+        # capture the key before scanning; commit() refuses to publish if the log changed mid-scan
+        self.key = build_key(log_file_path, ruleset_version)
+        self.tmp_path = self.paths["findings"] + ".tmp"
+        self.count = 0
+        # drop the old metadata first so an interrupted rewrite can never match it
+        if os.path.exists(self.paths["meta"]):
+            os.remove(self.paths["meta"])
+        try:
+            self._file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+        except OSError:
+            _remove_quietly(self.tmp_path)
+            raise
+
+    def write(self, finding: Dict[str, Any]) -> None:
+        record = {field: finding.get(field) for field in FINDING_FIELDS}
+        self._file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self.count += 1
+
+    def commit(self, sha256: str) -> bool:
+        # sha256 must be the digest of the bytes the scan actually parsed, not of the file as it is now
+        self._file.close()
+        if build_key(self.log_file_path, self.ruleset_version) != self.key:
+            # the log changed while it was being scanned, so these findings may not match it
+            self.abort()
+            return False
+        meta = dict(self.key)
+        meta["sha256"] = sha256
+        meta["count"] = self.count
+        os.replace(self.tmp_path, self.paths["findings"])
+        _write_meta(self.paths["meta"], meta)
+        return True
+
+    def abort(self) -> None:
+        # remove everything this writer may have produced, including a half-finished commit;
+        # closing can fail again (e.g. the disk is still full), which must not stop the cleanup
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        for path in (self.tmp_path, self.paths["findings"], self.paths["meta"] + ".tmp"):
+            _remove_quietly(path)
@@ -1,16 +1,25 @@
 # Minimal log parser: returns a list of non-empty lines from a plain text log file.
-def parse_log(file_path):
-    logs = []
+
+# Streaming variant of parse_log: yields non-empty lines as they are read.
+# If a hashlib object is passed as digest it is updated with the raw bytes read, and read
+# errors are appended to the errors list so callers can tell a partial read from a full one.
+def iter_log(file_path, digest=None, errors=None):
     try:
-        # open the log file and read each line
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
+        # read the log in binary so the digest covers exactly the bytes that were parsed
+        with open(file_path, 'rb') as f:
+            for raw_line in f:
+                if digest is not None:
+                    digest.update(raw_line)
                 # remove leading/trailing whitespace and skip empty lines
-                line = line.strip()
+                line = raw_line.decode('utf-8').strip()
                 if line:
-                    logs.append(line)
+                    yield line
     except Exception as e:
+        if errors is not None:
+            errors.append(e)
         # print an error message if the file cannot be read (e.g., missing or permission error)
         print(f"[log_parser] Error reading {file_path}: {e}")
+
+def parse_log(file_path):
     # return the list of parsed log lines for further processing
-    return logs
+    return list(iter_log(file_path))